@@ -0,0 +1,173 @@
+# disto_binlog.py
+# Compact append-only log for distance streams (31.. words).
+# Usage:
+#   python disto_binlog.py info  track_D8.dlog
+#   python disto_binlog.py to-csv track_D8.dlog track_D8.csv [--from 2025-01-31T08:00 --to 2025-01-31T09:00]
+# The GUI writes this format when the log path picked via "CSV…" ends in .dlog.
+#
+# Layout: a sequence of self-contained blocks, each
+#   header  <4sIqqqII  magic "DLB1", n records, t_first ms, t_last ms, mm_first, payload len, crc32
+#   payload zlib( (zigzag varint dt_ms, zigzag varint d_mm) * (n-1) )
+# The first record lives in the header, so a reader can seek by time by hopping
+# header to header without inflating payloads. A torn block at the end (crash)
+# is ignored by the reader and overwritten on the next append; a non-empty file
+# without any DLB1 block (e.g. a CSV) is refused instead of truncated.
+
+import sys, os, csv, struct, zlib, time, argparse, bisect
+from datetime import datetime
+
+MAGIC = b"DLB1"
+HDR = struct.Struct("<4sIqqqII")
+
+def _zz(v):    return v * 2 if v >= 0 else -v * 2 - 1
+def _unzz(z):  return z >> 1 if not z & 1 else -((z + 1) >> 1)
+
+def _put_varint(out, z):
+    while z > 0x7F:
+        out.append((z & 0x7F) | 0x80); z >>= 7
+    out.append(z)
+
+def _iter_varints(data):
+    z = shift = 0
+    for b in data:
+        z |= (b & 0x7F) << shift
+        if b & 0x80: shift += 7; continue
+        yield z
+        z = shift = 0
+
+class BinLogWriter:
+    """Buffers (t, mm) records and appends one compressed block per
+    block_records records or flush_secs seconds, whichever comes first."""
+    def __init__(self, path, block_records=1024, flush_secs=30.0):
+        self.path = path
+        self.block_records = block_records
+        self.flush_secs = flush_secs
+        # resume after the last complete block (drops a torn tail); a non-empty
+        # file without a single DLB1 block is not ours and is left alone
+        end = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            r = BinLogReader(path)
+            if not r.index: raise ValueError(f"{path}: not a .dlog file (no DLB1 block), refusing to overwrite")
+            end = r.end_offset()
+        self.f = open(path, "r+b" if os.path.exists(path) else "wb")
+        self.f.seek(end); self.f.truncate()
+        self._reset()
+
+    def _reset(self):
+        self.n = 0; self.payload = bytearray()
+        self.t_first = self.t_last = self.mm_first = self.mm_last = 0
+        self.opened = time.monotonic()
+
+    def append(self, t, mm):
+        """t: seconds since epoch (float), mm: integer distance in mm."""
+        t_ms = int(round(t * 1000)); mm = int(mm)
+        if self.n == 0:
+            self.t_first = t_ms; self.mm_first = mm
+            self.opened = time.monotonic()
+        else:
+            _put_varint(self.payload, _zz(t_ms - self.t_last))
+            _put_varint(self.payload, _zz(mm - self.mm_last))
+        self.t_last = t_ms; self.mm_last = mm; self.n += 1
+        if self.n >= self.block_records: self.flush()
+        else: self.poll()
+
+    def poll(self):
+        """Flush the open block once it is flush_secs old; call on a timer so a
+        block doesn't sit in memory after the stream stops."""
+        if self.n and time.monotonic() - self.opened >= self.flush_secs:
+            self.flush()
+
+    def flush(self):
+        if not self.n: return
+        body = zlib.compress(bytes(self.payload), 6)
+        self.f.write(HDR.pack(MAGIC, self.n, self.t_first, self.t_last, self.mm_first,
+                              len(body), zlib.crc32(body)))
+        self.f.write(body); self.f.flush()
+        self._reset()
+
+    def close(self):
+        self.flush(); self.f.close()
+
+class BinLogReader:
+    """Block index + streaming iterator over (t_seconds, mm) records."""
+    def __init__(self, path):
+        self.path = path
+        self.index = []   # (t_first_ms, t_last_ms, n, offset)
+        self._end = 0
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            off = 0
+            while off + HDR.size <= size:
+                f.seek(off)
+                magic, n, t0, t1, _, plen, _ = HDR.unpack(f.read(HDR.size))
+                if magic != MAGIC or off + HDR.size + plen > size: break
+                self.index.append((t0, t1, n, off))
+                off += HDR.size + plen
+            self._end = off
+
+    def end_offset(self): return self._end
+    def __len__(self):    return sum(b[2] for b in self.index)
+    def __iter__(self):   return self.records()
+
+    def _block(self, f, off):
+        f.seek(off)
+        _, n, t, _, mm, plen, crc = HDR.unpack(f.read(HDR.size))
+        body = f.read(plen)
+        if zlib.crc32(body) != crc:
+            raise ValueError(f"{self.path}: corrupt block at offset {off}")
+        yield t, mm
+        vals = _iter_varints(zlib.decompress(body))
+        for dt, dmm in zip(vals, vals):
+            t += _unzz(dt); mm += _unzz(dmm)
+            yield t, mm
+
+    def records(self, t_from=None, t_to=None):
+        """Yield (t, mm) with t_from <= t <= t_to (seconds since epoch); blocks
+        outside the range are skipped via the header index."""
+        lo = None if t_from is None else int(t_from * 1000)
+        hi = None if t_to is None else int(t_to * 1000)
+        start = 0
+        if lo is not None:   # first block whose t_last >= lo
+            start = bisect.bisect_left([b[1] for b in self.index], lo)
+        with open(self.path, "rb") as f:
+            for t0, t1, n, off in self.index[start:]:
+                if hi is not None and t0 > hi: break
+                for t, mm in self._block(f, off):
+                    if lo is not None and t < lo: continue
+                    if hi is not None and t > hi: break
+                    yield t / 1000.0, mm
+
+def to_csv(src, dst, t_from=None, t_to=None):
+    rows = 0
+    with open(dst, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["timestamp","mm","value"])
+        for t, mm in BinLogReader(src).records(t_from, t_to):
+            w.writerow([datetime.fromtimestamp(t).isoformat(timespec="milliseconds"), mm, mm / 1000.0])
+            rows += 1
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info");   p.add_argument("log")
+    p = sub.add_parser("to-csv"); p.add_argument("log"); p.add_argument("csv")
+    p.add_argument("--from", dest="t_from", default=None, help="ISO start time")
+    p.add_argument("--to", dest="t_to", default=None, help="ISO end time")
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        r = BinLogReader(args.log)
+        if not r.index: print("No complete blocks."); return
+        fmt = lambda ms: datetime.fromtimestamp(ms / 1000).isoformat(timespec="seconds")
+        size = os.path.getsize(args.log)
+        print(f"{args.log}: {len(r)} records in {len(r.index)} blocks, {size} bytes "
+              f"({size / max(len(r), 1):.2f} B/record)")
+        print(f"  from {fmt(r.index[0][0])}  to {fmt(r.index[-1][1])}")
+    else:
+        iso = lambda s: datetime.fromisoformat(s).timestamp() if s else None
+        n = to_csv(args.log, args.csv, iso(args.t_from), iso(args.t_to))
+        print(f"Wrote {n} rows to {args.csv}")
+
+if __name__ == "__main__":
+    sys.exit(main())
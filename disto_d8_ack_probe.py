@@ -1,10 +1,17 @@
 # disto_d8_ack_probe.py
 # Quick tester: try different confirms (cfm\n, ACK 0x06, both)
-# Run this on COM7 while you press the D8’s send key. 
-# It prints tokens and immediately sends the chosen confirm. You can switch mode at the top.
+# Run this on COM7 while you press the D8’s send key.
+# It prints tokens and immediately sends the chosen confirm. You can switch mode at the top
+# or on the command line:
+#   python disto_d8_ack_probe.py COM7 --mode both
+# Benchmark: confirm latency (line received → confirm flushed) per strategy, N pushes each.
+#   python disto_d8_ack_probe.py COM7 --bench 20                 # cfm, ack06, both in turn
+#   python disto_d8_ack_probe.py COM7 --bench 20 --mode ack06
+# A push that comes back again within --repeat-window seconds counts as "repeat"
+# (device didn't take the confirm → that's where Info 240 shows up).
 
 
-import sys, time, re
+import sys, time, re, argparse, statistics
 from datetime import datetime
 
 MODE = "cfm"   # "cfm", "ack06", or "both"
@@ -14,24 +21,27 @@ BAUD = 9600
 import serial
 
 TOKEN_RE = re.compile(r"^(?P<cmd>\d{2})\.\.(?P<unit>\d{2})(?P<sign>[+-])(?P<val>\d{5,10})$")
+MODES = ("cfm", "ack06", "both")
+CONFIRM = {"cfm": b"cfm\n", "ack06": b"\x06", "both": b"cfm\n\x06"}
 
-def confirm(ser: serial.Serial):
-    if MODE in ("cfm", "both"):
-        ser.write(b"cfm\n")
-        ser.flush()
+def confirm(ser: serial.Serial, mode=None):
+    mode = mode or MODE
+    ser.write(CONFIRM[mode])   # one write: no gap between cfm and ACK in "both"
+    ser.flush()
+    if mode in ("cfm", "both"):
         print("TX: cfm\\n")
-    if MODE in ("ack06", "both"):
-        ser.write(b"\x06")
-        ser.flush()
+    if mode in ("ack06", "both"):
         print("TX: ACK (0x06)")
 
-with serial.Serial(PORT, BAUD, timeout=2) as ser:
-    print(f"Opened {PORT} @ {BAUD}. Mode={MODE}. Press SEND on D8.")
+def lines(ser: serial.Serial):
+    """Yield (line_text, t_rx) as lines complete; t_rx = perf_counter when the
+    read that completed the line returned."""
     buf = bytearray()
     while True:
-        chunk = ser.read(256)
+        chunk = ser.read(ser.in_waiting or 1)
         if not chunk:
-            time.sleep(0.02); continue
+            continue
+        t_rx = time.perf_counter()
         buf.extend(chunk)
         # lines may contain multiple tokens
         while b"\r" in buf or b"\n" in buf:
@@ -41,15 +51,73 @@ with serial.Serial(PORT, BAUD, timeout=2) as ser:
                     buf = bytearray(rest)
                     break
             text = line.decode(errors="ignore").strip()
-            if not text: continue
-            if text.startswith("@"):
-                print("STATUS:", text); continue
-            for tok in text.split():
-                m = TOKEN_RE.fullmatch(tok)
-                if m:
-                    sign = -1 if m["sign"] == "-" else 1
-                    mm = sign * int(m["val"])
-                    print(f"{datetime.now().isoformat(timespec='seconds')}  {mm/1000:.3f} m  ({mm} mm)  [{tok}]")
-                    confirm(ser)
-                else:
-                    print("UNPARSED:", tok)
+            if text: yield text, t_rx
+
+def probe(ser):
+    print(f"Opened {ser.port} @ {ser.baudrate}. Mode={MODE}. Press SEND on D8.")
+    for text, _ in lines(ser):
+        if text.startswith("@"):
+            print("STATUS:", text); continue
+        for tok in text.split():
+            m = TOKEN_RE.fullmatch(tok)
+            if m:
+                sign = -1 if m["sign"] == "-" else 1
+                mm = sign * int(m["val"])
+                print(f"{datetime.now().isoformat(timespec='seconds')}  {mm/1000:.3f} m  ({mm} mm)  [{tok}]")
+                confirm(ser)
+            else:
+                print("UNPARSED:", tok)
+
+def bench(ser, modes, pushes, repeat_window):
+    results = {}
+    it = lines(ser)   # one framer for all modes: a partial line carries over to the next strategy
+    for mode in modes:
+        print(f"\n== {mode}: press SEND on the D8 {pushes}× (vary the value between presses) ==")
+        lat, repeats = [], 0
+        last_tok, last_t = None, 0.0
+        while len(lat) < pushes:
+            text, t_rx = next(it)
+            toks = [t for t in text.split() if TOKEN_RE.fullmatch(t) and t.startswith("31..")]
+            if not toks:
+                if text.startswith("@"): print("STATUS:", text)
+                continue
+            ser.write(CONFIRM[mode]); ser.flush()
+            ms = (time.perf_counter() - t_rx) * 1000
+            if toks[0] == last_tok and t_rx - last_t < repeat_window:
+                repeats += 1
+                print(f"  repeat of {toks[0]} (confirm not accepted?)  {ms:.2f} ms")
+            else:
+                lat.append(ms)
+                print(f"  {len(lat):3d}/{pushes}  {toks[0]}  confirm {ms:.2f} ms")
+            last_tok, last_t = toks[0], t_rx
+        results[mode] = (lat, repeats)
+
+    print("\nConfirm latency (line received → confirm flushed), ms")
+    print(f"{'mode':6}  {'n':>4}  {'min':>7}  {'median':>7}  {'p95':>7}  {'max':>7}  repeats")
+    for mode, (lat, repeats) in results.items():
+        s = sorted(lat)
+        p95 = s[min(len(s) - 1, int(round(0.95 * (len(s) - 1))))]
+        print(f"{mode:6}  {len(s):4d}  {s[0]:7.2f}  {statistics.median(s):7.2f}  {p95:7.2f}  {s[-1]:7.2f}  {repeats}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("port", nargs="?", default=PORT)
+    ap.add_argument("--baud", type=int, default=BAUD)
+    ap.add_argument("--mode", choices=MODES, default=None)
+    ap.add_argument("--bench", type=int, default=0, metavar="N", help="benchmark N pushes per strategy")
+    ap.add_argument("--repeat-window", type=float, default=3.0, help="seconds; same token again = repeat")
+    args = ap.parse_args()
+
+    global MODE
+    if args.mode: MODE = args.mode
+    with serial.Serial(args.port, args.baud, timeout=2) as ser:
+        try:
+            if args.bench:
+                bench(ser, [args.mode] if args.mode else list(MODES), args.bench, args.repeat_window)
+            else:
+                probe(ser)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,36 @@
 # R3 adds: Signal (K), Temperature (T), Clear (c), Device Info (N00N..N03N),
 # AVG ×N (spinner), Danger Zone (Reset/Power-off) with confirmation,
 # CRLF command framing + push-mode confirm (cfm\n) with suppression.
+# Filter: optional constant-velocity Kalman stage (filtered distance + velocity).
+# Log: "CSV…" path ending in .dlog writes the compact binary log (disto_binlog.py).
+# DB: optional SQLite store (disto_store.py) fed as a worker sink.
+# Serve: local TCP fan-out of live events (disto_stream_server.py), also a worker sink.
+# Live plot: tracking trace on a Tk canvas (min/max pyramid, capped redraw rate).
+# Push fast path: cfm\n goes out as soon as a framed line holds a 31.. token,
+# before parsing/emitting; confirm latency is recorded per push.
+# Startup: pyserial / csv / storage modules load on first use; COM ports are
+# enumerated in the background (see disto_startup_bench.py for timings).
 # Build Instruction
 # pyinstaller --noconsole --onefile disto_d8_gui_R3.py
 
 
-import threading, queue, time, re, csv, os
+import threading, queue, time, re, os
+from collections import deque
 from datetime import datetime
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, simpledialog
+from tkinter import ttk, messagebox
 
-try:
-    import serial
-    import serial.tools.list_ports as list_ports
-except Exception:
-    raise SystemExit("pyserial missing. Install: python -m pip install --upgrade pyserial")
+# Heavy / optional modules are imported on first use, not at startup:
+# pyserial (worker thread, port scan), csv, disto_binlog, disto_store,
+# disto_stream_server, tkinter.filedialog.
+PYSERIAL_HINT = "pyserial missing. Install: python -m pip install --upgrade pyserial"
+
+def _serial():
+    try:
+        import serial
+    except Exception:
+        raise ImportError(PYSERIAL_HINT)
+    return serial
 
 # -------- Parsing --------
 DIST_RE = re.compile(r"^(?P<cmd>\d{2})\.\.(?P<unit>\d{2})(?P<sign>[+-])(?P<val>\d{5,10})$")
@@ -70,10 +86,59 @@ def parse_word(tok: str):
         "token": tok,
     }
 
+# -------- Filtering --------
+KF_ACCEL_STD = 0.05   # process noise: unmodelled acceleration (m/s²)
+KF_MEAS_STD  = 0.002  # measurement noise of a single 31.. reading (m)
+
+class KalmanCV:
+    """1-D constant-velocity Kalman filter over distance readings.
+
+    State is (distance m, velocity m/s). update() is O(1) and returns the
+    filtered pair; a gap longer than reset_after seconds restarts the filter
+    from the raw value so a re-aimed device doesn't drag the old estimate in.
+    """
+    def __init__(self, accel_std=KF_ACCEL_STD, meas_std=KF_MEAS_STD, reset_after=2.0):
+        self.qq = accel_std * accel_std
+        self.rr = meas_std * meas_std
+        self.reset_after = reset_after
+        self.reset()
+
+    def reset(self):
+        self.x = None; self.v = 0.0; self.t = None
+        self.p00 = self.p01 = self.p11 = 0.0
+
+    def update(self, t, z):
+        if self.x is None or t - self.t > self.reset_after:
+            self.x, self.v, self.t = z, 0.0, t
+            self.p00, self.p01, self.p11 = self.rr, 0.0, 1.0
+            return self.x, self.v
+        dt = max(t - self.t, 0.0); self.t = t
+        # predict
+        if dt:
+            dt2 = dt * dt
+            self.x += self.v * dt
+            self.p00 += 2*dt*self.p01 + dt2*self.p11 + self.qq*dt2*dt2/4
+            self.p01 += dt*self.p11 + self.qq*dt2*dt/2
+            self.p11 += self.qq*dt2
+        # correct
+        s = self.p00 + self.rr
+        k0 = self.p00 / s; k1 = self.p01 / s
+        y = z - self.x
+        self.x += k0 * y; self.v += k1 * y
+        p01 = self.p01
+        self.p00 -= k0 * self.p00
+        self.p01 -= k0 * p01
+        self.p11 -= k1 * p01
+        return self.x, self.v
+
 # -------- Serial worker --------
+MAX_LINE = 4096   # bytes buffered without an EOL before the partial line is dropped
+# D8 push protocol: one cfm per pushed line (= one SEND press), even if the line holds several 31.. words
+PUSH_RE = re.compile(rb"(?:^|\s)31\.\.\d{2}[+-]\d{5,10}(?:\s|$)")   # distance token in a raw line
+
 class SerialWorker(threading.Thread):
     def __init__(self, port, baud, out_q, status_cb,
-                 confirm_push=True, idle_seconds=10):
+                 confirm_push=True, idle_seconds=10, kf=None, sinks=()):
         super().__init__(daemon=True)
         self.port = port
         self.baud = baud
@@ -81,6 +146,8 @@ class SerialWorker(threading.Thread):
         self.status_cb = status_cb
         self.confirm_push = confirm_push
         self.idle_seconds = idle_seconds
+        self.kf = kf   # optional KalmanCV for distance words
+        self.sinks = list(sinks)   # extra consumers of every emitted item (must not block)
 
         self.stop_flag = threading.Event()
         self.ser = None
@@ -94,9 +161,20 @@ class SerialWorker(threading.Thread):
         self.avg_capture = False
         self.avg_target = 10
         self.avg_vals = []
+        self.push_lat_ms = deque(maxlen=500)   # recent confirm latencies (RX → cfm written), one per push
+        self.state = None
+
+    def _status(self, state):
+        # reads now return per byte burst; only report actual state changes
+        if state != self.state:
+            self.state = state; self.status_cb(state)
 
     # --- emit/log ---
-    def emit(self, item): self.out_q.put(item)
+    def emit(self, item):
+        self.out_q.put(item)
+        for sink in self.sinks:
+            try: sink(item)
+            except Exception: pass
     def log(self, msg):   self.emit({"type":"debug","text":msg})
 
     # --- writing ---
@@ -116,6 +194,9 @@ class SerialWorker(threading.Thread):
     def set_confirm_push(self, enabled: bool):
         self.confirm_push = enabled
 
+    def set_filter(self, kf):
+        self.kf = kf
+
     def start_avg(self, n: int):
         self.avg_target = n
         self.avg_vals = []
@@ -132,14 +213,48 @@ class SerialWorker(threading.Thread):
     def stop_tracking(self):
         self.send_cmd("P")
 
+    def push_stats(self):
+        """(count, median, p95, max) of recent confirm latencies in ms, or None."""
+        lat = sorted(self.push_lat_ms)
+        if not lat: return None
+        pct = lambda p: lat[min(len(lat)-1, int(round(p * (len(lat)-1))))]   # same index as the benches
+        return len(lat), pct(0.5), pct(0.95), lat[-1]
+
+    def _frame_lines(self):
+        lines = []
+        while b"\r" in self.buf or b"\n" in self.buf:
+            line = None
+            for eol in (b"\r\n", b"\n", b"\r"):
+                if eol in self.buf:
+                    line, _, rest = self.buf.partition(eol)
+                    self.buf = bytearray(rest)
+                    break
+            if line is None: break
+            lines.append(line)
+        return lines
+
+    def _push_confirm(self, lines, t_rx):
+        """Push-mode fast path: one cfm\\n per pushed line, written before any
+        decoding/emitting. Several queued pushes in one read go out as one write;
+        each of them is recorded as one latency sample."""
+        n = sum(1 for line in lines if PUSH_RE.search(line))
+        if not n: return
+        try:
+            self.ser.write(b"cfm\n" * n); self.ser.flush()
+        except Exception as e:
+            self.emit({"type":"debug","text":f"Confirm failed: {e}"}); return
+        lat = (time.perf_counter() - t_rx) * 1000
+        self.push_lat_ms.extend([lat] * n)
+        self.emit({"type":"push_confirm","count":n,"latency_ms":lat})
+
     # --- thread loop ---
     def run(self):
         try:
-            self.ser = serial.Serial(self.port, self.baud, timeout=0.05)
-            self.status_cb("connected")
+            self.ser = _serial().Serial(self.port, self.baud, timeout=0.05)
+            self._status("connected")
             self.log(f"Opened {self.port} @ {self.baud}. Ready.")
         except Exception as e:
-            self.status_cb("disconnected")
+            self._status("disconnected")
             self.log(f"ERROR opening {self.port}: {e}")
             return
 
@@ -158,6 +273,7 @@ class SerialWorker(threading.Thread):
                     self.emit({"type":"debug","text":f"TX CMD: {repr(ch)} (CRLF)"})
                     if ch in ("H","h"):
                         self.tracking = True
+                        if self.kf: self.kf.reset()
                         self.emit({"type":"tracking","active":True})
                     elif ch in ("P","p","c","C"):
                         self.tracking = False
@@ -165,31 +281,33 @@ class SerialWorker(threading.Thread):
 
                 # idle
                 if time.time() - self.last_rx > self.idle_seconds:
-                    self.status_cb("idle")
+                    self._status("idle")
 
-                # read
+                # read: whatever is waiting, else block (up to timeout) for the first byte
                 try:
-                    chunk = self.ser.read(256)
+                    chunk = self.ser.read(self.ser.in_waiting or 1)
                 except Exception as e:
                     self.log(f"Serial read error: {e}")
                     break
                 if not chunk:
                     continue
+                t_rx = time.perf_counter()
 
                 self.last_rx = time.time()
-                self.status_cb("connected")
+                self._status("connected")
                 self.buf.extend(chunk)
+                if len(self.buf) > MAX_LINE and b"\r" not in self.buf and b"\n" not in self.buf:
+                    self.log(f"RX overflow: dropped {len(self.buf)} bytes without line end")
+                    self.buf.clear()
 
                 # lines
-                while b"\r" in self.buf or b"\n" in self.buf:
-                    line = None
-                    for eol in (b"\r\n", b"\n", b"\r"):
-                        if eol in self.buf:
-                            line, _, rest = self.buf.partition(eol)
-                            self.buf = bytearray(rest)
-                            break
-                    if line is None: break
+                lines = self._frame_lines()
+                if not lines: continue
+                # push confirm (only for push-mode; suppress after our own cmd) — checked once per read
+                if self.confirm_push and not self.tracking and (time.time() - self.last_cmd_time) > 1.0:
+                    self._push_confirm(lines, t_rx)
 
+                for line in lines:
                     text = line.decode(errors="ignore").strip()
                     if not text: continue
 
@@ -206,8 +324,11 @@ class SerialWorker(threading.Thread):
                     for tok in tokens:
                         w = parse_word(tok)
                         if w:
+                            now = time.time()
                             ts = datetime.now().isoformat(timespec="seconds")
-                            self.emit({"type":"word","ts":ts, **w})
+                            if self.kf and w["kind"] == "distance":
+                                w["filt_m"], w["vel_mps"] = self.kf.update(now, w["value"])
+                            self.emit({"type":"word","ts":ts,"t":now, **w})
                             # handle behaviors
                             if w["kind"] == "distance":
                                 # AVG capture
@@ -219,30 +340,165 @@ class SerialWorker(threading.Thread):
                                         self.emit({"type":"avg_done","avg_m":avg_m,"count":len(self.avg_vals)})
                                         self.stop_avg()
                                         self.stop_tracking()
-                                # Push confirm (only for push-mode; suppress after our own cmd)
-                                if self.confirm_push and (time.time() - self.last_cmd_time) > 1.0 and not self.tracking:
-                                    try:
-                                        self._write(b"cfm\n")
-                                        self.emit({"type":"debug","text":"TX: cfm\\n"})
-                                    except Exception as e:
-                                        self.emit({"type":"debug","text":f"Confirm failed: {e}"})
                         else:
                             self.emit({"type":"unparsed","text":tok})
         finally:
             try:
                 if self.ser and self.ser.is_open: self.ser.close()
             except Exception: pass
-            self.status_cb("disconnected")
+            self._status("disconnected")
             self.log("Disconnected.")
 
     def stop(self): self.stop_flag.set()
 
+# -------- Live plot --------
+PLOT_FPS = 10   # redraw cap (frames per second)
+PLOT_SPANS = {"1 min": 60, "10 min": 600, "1 h": 3600, "All": None}
+
+class MinMaxRing:
+    """Bounded (t, value) history with a min/max pyramid for cheap redraws.
+
+    Level 0 keeps raw samples, level k keeps buckets of factor**k samples as
+    (t_first, t_last, lo, hi). Every level is a fixed-size ring, so memory is
+    constant over hours of tracking and a query reads at most ~2 buckets per
+    pixel column on the first level that covers the requested window.
+    """
+    def __init__(self, capacity=4096, factor=4, levels=8):
+        self.factor = factor
+        self.levels = [deque(maxlen=capacity) for _ in range(levels)]
+        self.partial = [None] * levels   # open bucket feeding level k (k >= 1)
+        self.count = 0
+
+    def clear(self):
+        for ring in self.levels: ring.clear()
+        self.partial = [None] * len(self.levels)
+        self.count = 0
+
+    def append(self, t, v):
+        self.count += 1
+        self._push(0, (t, t, v, v))
+
+    def _push(self, lvl, b):
+        self.levels[lvl].append(b)
+        up = lvl + 1
+        if up >= len(self.levels): return
+        p = self.partial[up]
+        if p is None:
+            p = self.partial[up] = [b[0], b[1], b[2], b[3], 1]
+        else:
+            p[1] = b[1]
+            if b[2] < p[2]: p[2] = b[2]
+            if b[3] > p[3]: p[3] = b[3]
+            p[4] += 1
+        if p[4] >= self.factor:
+            self.partial[up] = None
+            self._push(up, (p[0], p[1], p[2], p[3]))
+
+    def first_t(self):
+        return min((ring[0][0] for ring in self.levels if ring), default=None)
+
+    def last_t(self):
+        return self.levels[0][-1][1] if self.levels[0] else None
+
+    def columns(self, t0, t1, width):
+        """Per-pixel (lo, hi) over [t0, t1]; None for columns without data."""
+        cols = [None] * max(width, 0)
+        if width <= 0 or t1 <= t0 or not self.levels[0]: return cols
+        budget = 2 * width
+        picked = []
+        for lvl, ring in enumerate(self.levels):
+            # open buckets not yet rolled into this level, oldest first
+            tail = [tuple(p[:4]) for p in self.partial[lvl:0:-1] if p]
+            picked = []; reached = False
+            for b in _newest_first(tail, ring):
+                if b[1] < t0: reached = True; break
+                picked.append(b)
+                if len(picked) > budget: break
+            covered = reached or len(ring) < ring.maxlen
+            if (covered and len(picked) <= budget) or lvl == len(self.levels) - 1:
+                break
+        scale = width / (t1 - t0)
+        for a, _, lo, hi in picked:
+            x = int((a - t0) * scale)
+            if x < 0: x = 0
+            elif x >= width: x = width - 1
+            c = cols[x]
+            if c is None: cols[x] = (lo, hi)
+            else: cols[x] = (min(c[0], lo), max(c[1], hi))
+        return cols
+
+def _newest_first(tail, ring):
+    yield from reversed(tail)
+    yield from reversed(ring)
+
+class TrackPlot(ttk.Labelframe):
+    """Distance trace; redraws at most PLOT_FPS times per second, only when dirty."""
+    def __init__(self, master, ring=None, **kw):
+        super().__init__(master, text="Live plot", padding=8, **kw)
+        self.ring = ring or MinMaxRing()
+        self.dirty = False
+
+        bar = ttk.Frame(self); bar.pack(fill="x")
+        ttk.Label(bar, text="Window:").pack(side="left")
+        self.span_var = tk.StringVar(value="1 min")
+        ttk.Combobox(bar, textvariable=self.span_var, values=tuple(PLOT_SPANS), width=8, state="readonly").pack(side="left", padx=(4,12))
+        ttk.Button(bar, text="Clear plot", command=self.clear).pack(side="left")
+        self.range_var = tk.StringVar(value="")
+        ttk.Label(bar, textvariable=self.range_var).pack(side="left", padx=12)
+        self.span_var.trace_add("write", lambda *_: self.mark_dirty())
+
+        self.cv = tk.Canvas(self, height=140, background="#101418", highlightthickness=0)
+        self.cv.pack(fill="both", expand=True, pady=(6,0))
+        self.trace_id = self.cv.create_line(0,0,0,0, fill="#3fc1ff")
+        self.cv.bind("<Configure>", lambda e: self.mark_dirty())
+        self.after(int(1000 / PLOT_FPS), self._tick)
+
+    def add(self, t, value):
+        self.ring.append(t, value); self.dirty = True
+
+    def mark_dirty(self): self.dirty = True
+
+    def clear(self):
+        self.ring.clear(); self.range_var.set("")
+        self.cv.coords(self.trace_id, 0,0,0,0)
+
+    def _tick(self):
+        if self.dirty:
+            self.dirty = False
+            self.redraw()
+        self.after(int(1000 / PLOT_FPS), self._tick)
+
+    def redraw(self):
+        w = self.cv.winfo_width(); h = self.cv.winfo_height()
+        t1 = self.ring.last_t()
+        if t1 is None or w < 2 or h < 8: return
+        span = PLOT_SPANS.get(self.span_var.get())
+        t0 = t1 - span if span else self.ring.first_t()
+        if t1 - t0 < 1.0: t0 = t1 - 1.0
+        cols = self.ring.columns(t0, t1, w)
+        present = [c for c in cols if c]
+        lo = min(c[0] for c in present); hi = max(c[1] for c in present)
+        pad = max((hi - lo) * 0.05, 0.0005)   # at least 0.5 mm headroom
+        lo -= pad; hi += pad
+        k = (h - 4) / (hi - lo)
+        pts = []
+        for x, c in enumerate(cols):
+            if c is None: continue
+            y_lo = h - 2 - (c[0] - lo) * k; y_hi = h - 2 - (c[1] - lo) * k
+            # zig-zag through each column's min/max: one line item, O(width) points
+            if x & 1: pts += (x, y_hi, x, y_lo)
+            else:     pts += (x, y_lo, x, y_hi)
+        self.cv.coords(self.trace_id, pts)
+        self.range_var.set(f"{lo+pad:.3f} … {hi-pad:.3f} m   ({self.ring.count} samples)")
+
 # -------- GUI --------
+LOG_MAX_LINES = 5000   # older log lines are trimmed so the Text widget stays bounded
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Leica DISTO D8 — Remote R3")
-        self.geometry("1040x680")
+        self.geometry("1040x860")
 
         self.out_q = queue.Queue()
         self.worker = None
@@ -252,24 +508,32 @@ class App(tk.Tk):
         self.latest_signal_mv = None
 
         self.csv_path = None
+        self.binlog = None
+        self.store = None
+        self.store_seen = (0, None)   # (dropped, last_error) already shown in the log
+        self.server = None
+        self.serve_on = tk.BooleanVar(value=False)
         self.csv_enabled = tk.BooleanVar(value=False)
         self.auto_copy = tk.BooleanVar(value=False)
         self.confirm_push = tk.BooleanVar(value=True)
         self.tracking_active = tk.BooleanVar(value=False)
+        self.filter_on = tk.BooleanVar(value=False)
 
         self.mark_next = None
         self.avg_progress_var = tk.StringVar(value="")
         self.avg_n_var = tk.IntVar(value=10)
 
         self.make_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.after(50, self.drain)
+        self.after_idle(self.refresh_ports)   # after the window is up
 
     def make_ui(self):
         top = ttk.Frame(self, padding=8); top.pack(fill="x")
         ttk.Label(top, text="Port:").pack(side="left")
         self.port_var = tk.StringVar()
         self.port_combo = ttk.Combobox(top, textvariable=self.port_var, width=14, state="readonly")
-        self.refresh_ports(); self.port_combo.pack(side="left", padx=(4,12))
+        self.port_combo.pack(side="left", padx=(4,12))
 
         ttk.Label(top, text="Baud:").pack(side="left")
         self.baud_var = tk.StringVar(value="9600")
@@ -279,7 +543,9 @@ class App(tk.Tk):
         self.connect_btn = ttk.Button(top, text="Connect", command=self.toggle_connect); self.connect_btn.pack(side="left", padx=(0,8))
 
         ttk.Checkbutton(top, text="CSV on", variable=self.csv_enabled).pack(side="right")
+        ttk.Checkbutton(top, text="Serve (TCP)", variable=self.serve_on, command=self._on_serve_toggle).pack(side="right", padx=(0,12))
         self.csv_btn = ttk.Button(top, text="CSV…", command=self.pick_csv); self.csv_btn.pack(side="right", padx=(0,8))
+        self.db_btn = ttk.Button(top, text="DB…", command=self.pick_db); self.db_btn.pack(side="right", padx=(0,8))
         self.refresh_btn = ttk.Button(top, text="Rescan Ports", command=self.refresh_ports); self.refresh_btn.pack(side="right", padx=(0,8))
 
         # Status
@@ -301,6 +567,9 @@ class App(tk.Tk):
         self.signal_var = tk.StringVar(value="— mV")
         ttk.Label(mid, textvariable=self.temp_var).pack(side="left", padx=(12,8))
         ttk.Label(mid, textvariable=self.signal_var).pack(side="left")
+        ttk.Checkbutton(mid, text="Filter (Kalman)", variable=self.filter_on, command=self._on_filter_toggle).pack(side="left", padx=(24,8))
+        self.filt_var = tk.StringVar(value="")
+        ttk.Label(mid, textvariable=self.filt_var).pack(side="left")
 
         # Remote control buttons
         cmdf = ttk.Labelframe(self, text="Remote Control", padding=8); cmdf.pack(fill="x", padx=8, pady=(0,8))
@@ -329,27 +598,48 @@ class App(tk.Tk):
         markf = ttk.Frame(self, padding=8); markf.pack(fill="x")
         ttk.Button(markf, text="Mark", command=self._mark, state="normal").pack(side="left")
 
+        self.plot = TrackPlot(self); self.plot.pack(fill="x", padx=8, pady=(0,8))
+
         logf = ttk.Labelframe(self, text="Log", padding=8); logf.pack(fill="both", expand=True, padx=8, pady=(0,8))
-        self.log = tk.Text(logf, height=16, wrap="word"); self.log.pack(fill="both", expand=True); self.log.configure(state="disabled")
+        self.log = tk.Text(logf, height=12, wrap="word"); self.log.pack(fill="both", expand=True); self.log.configure(state="disabled")
 
     # UI helpers
     def refresh_ports(self):
-        ports = [p.device for p in list_ports.comports()]
+        """Enumerate COM ports off the UI thread; the result arrives via out_q."""
+        self.refresh_btn.config(state="disabled", text="Scanning…")
+        threading.Thread(target=self._scan_ports, daemon=True).start()
+
+    def _scan_ports(self):
+        try:
+            _serial()
+            from serial.tools import list_ports
+            self.out_q.put({"type":"ports","ports":[p.device for p in list_ports.comports()]})
+        except Exception as e:
+            self.out_q.put({"type":"ports","ports":[],"error":str(e)})
+
+    def _on_ports(self, item):
+        self.refresh_btn.config(state="normal", text="Rescan Ports")
+        if "error" in item: self._log(f"Port scan failed: {item['error']}"); return
+        ports = item["ports"]
         self.port_combo["values"] = ports
         if ports and not self.port_var.get():
             self.port_var.set(ports[0])
 
     def toggle_connect(self):
         if self.worker:
+            st = self.worker.push_stats()
+            if st: self._log("Push confirm: n=%d  median %.1f  p95 %.1f  max %.1f ms" % st)
             self.worker.stop(); self.worker = None
             self.connect_btn.config(text="Connect")
             self._set_status("disconnected"); return
         port = self.port_var.get()
         if not port: messagebox.showerror("No port","Select a COM port."); return
+        if self.store: self.store.device = port
         try: baud = int(self.baud_var.get())
         except: messagebox.showerror("Baud error","Invalid baud."); return
         self.worker = SerialWorker(port, baud, self.out_q, self._set_status,
-                                   confirm_push=self.confirm_push.get(), idle_seconds=10)
+                                   confirm_push=self.confirm_push.get(), idle_seconds=10,
+                                   kf=self._make_filter(), sinks=self._sinks())
         self.worker.start(); self.connect_btn.config(text="Disconnect")
 
     def _set_status(self, state: str):
@@ -387,8 +677,55 @@ class App(tk.Tk):
             self.worker.send_cmd("b")
 
     def pick_csv(self):
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV","*.csv")])
-        if path: self.csv_path = path; self._log(f"CSV path: {path}")
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV","*.csv"),("Binary log","*.dlog")])
+        if path:
+            self._close_binlog()
+            self.csv_path = path; self._log(f"CSV path: {path}")
+
+    def pick_db(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(defaultextension=".sqlite", filetypes=[("SQLite","*.sqlite *.db")])
+        if not path: return
+        self._close_store()
+        try:
+            from disto_store import WordStore
+            self.store = WordStore(path, device=self.port_var.get())
+        except Exception as e:
+            self.store = None; messagebox.showerror("DB error", str(e)); return
+        if self.worker: self.worker.sinks = self._sinks()
+        self._log(f"DB path: {path}")
+
+    def _check_store(self):
+        st = self.store
+        if not st: return
+        now = (st.dropped, st.last_error)
+        if now == self.store_seen: return
+        if now[1] and now[1] != self.store_seen[1]: self._log(f"DB write failed (retrying): {now[1]}")
+        elif not now[1] and self.store_seen[1]: self._log("DB writes recovered")
+        if now[0] != self.store_seen[0]: self._log(f"DB: {now[0]} rows dropped so far")
+        self.store_seen = now
+
+    def _close_store(self):
+        if not self.store: return
+        self.store.close(); self._check_store()
+        self.store = None; self.store_seen = (0, None)
+
+    def _sinks(self):
+        return [s for s in (self.store, self.server) if s]
+
+    def _on_serve_toggle(self):
+        if self.serve_on.get() and not self.server:
+            try:
+                from disto_stream_server import StreamServer
+                self.server = StreamServer().start()
+            except OSError as e:
+                self.serve_on.set(False); messagebox.showerror("Server error", str(e)); return
+            self._log(f"Streaming on 127.0.0.1:{self.server.port}")
+        elif not self.serve_on.get() and self.server:
+            self.server.stop(); self.server = None
+            self._log("Streaming stopped")
+        if self.worker: self.worker.sinks = self._sinks()
 
     def copy_distance(self):
         if self.latest_distance_m is None: return
@@ -399,8 +736,17 @@ class App(tk.Tk):
     def _on_confirm_toggle(self):
         if self.worker: self.worker.set_confirm_push(self.confirm_push.get())
 
+    def _make_filter(self):
+        return KalmanCV() if self.filter_on.get() else None
+
+    def _on_filter_toggle(self):
+        if self.worker: self.worker.set_filter(self._make_filter())
+        if not self.filter_on.get(): self.filt_var.set("")
+
     def _log(self, msg: str):
         self.log.configure(state="normal"); self.log.insert("end", msg+"\n")
+        excess = int(self.log.index("end-1c").split(".")[0]) - LOG_MAX_LINES
+        if excess > 0: self.log.delete("1.0", f"{excess + 1}.0")
         self.log.see("end"); self.log.configure(state="disabled")
 
     # queue drain
@@ -416,6 +762,7 @@ class App(tk.Tk):
             elif t == "tracking":
                 self.tracking_active.set(item["active"])
                 self._log(f"Tracking: {'ON' if item['active'] else 'OFF'}")
+                if not item["active"]: self._flush_binlog(force=True)
             elif t == "avg_state":
                 if item["active"]:
                     self.avg_progress_var.set(f"Sampling {item['count']}/{item['target']}…")
@@ -433,12 +780,17 @@ class App(tk.Tk):
                 if kind == "distance":
                     self.latest_distance_m = item["value"]
                     self.dist_var.set(disp)
+                    self.plot.add(item["t"], item["value"])
+                    if "filt_m" in item:
+                        self.filt_var.set(f"≈ {item['filt_m']:.4f} m  {item['vel_mps']*1000:+.1f} mm/s")
                     self.copy_btn.config(state="normal")
                     tag = f"  <{self.mark_next}>" if self.mark_next else ""
                     self._log(f"{ts}  {disp}  [{tok}]"+tag)
                     if self.mark_next: self.mark_next = None
                     if self.auto_copy.get(): self.copy_distance()
-                    if self.csv_enabled.get() and self.csv_path: self._write_csv(ts, item)
+                    if self.csv_enabled.get() and self.csv_path:
+                        if self.csv_path.lower().endswith(".dlog"): self._write_binlog(item)
+                        else: self._write_csv(ts, item)
                 elif kind == "temperature":
                     self.latest_temp_c = item["value"]
                     self.temp_var.set(disp)
@@ -451,9 +803,17 @@ class App(tk.Tk):
                     self._log(f"{ts}  {disp}")
             elif t == "unparsed":
                 self._log(f"UNPARSED: {item['text']}")
+            elif t == "ports":
+                self._on_ports(item)
+            elif t == "push_confirm":
+                n = item["count"]
+                self._log(f"TX: cfm\\n{f' ×{n}' if n > 1 else ''}  ({item['latency_ms']:.1f} ms after RX)")
+        self._flush_binlog()
+        self._check_store()
         self.after(50, self.drain)
 
     def _write_csv(self, ts, item):
+        import csv
         hdr = ["timestamp","token","word_index","unit_code","sign","raw","kind","value"]
         need_header = not (self.csv_path and os.path.exists(self.csv_path) and os.path.getsize(self.csv_path) > 0)
         try:
@@ -473,5 +833,39 @@ class App(tk.Tk):
         except Exception as e:
             self._log(f"CSV write failed: {e}")
 
+    def _write_binlog(self, item):
+        if self.binlog is None:
+            from disto_binlog import BinLogWriter
+            try: self.binlog = BinLogWriter(self.csv_path)
+            except Exception as e:
+                self.csv_enabled.set(False)   # don't retry (and re-log) on every word
+                self._log(f"Binary log not opened, logging off: {e}"); return
+        try:
+            mm = -item["raw"] if item["sign"] == "-" else item["raw"]
+            self.binlog.append(item["t"], mm)
+        except Exception as e:
+            self._log(f"Binary log write failed: {e}")
+
+    def _flush_binlog(self, force=False):
+        if not self.binlog: return
+        try:
+            if force: self.binlog.flush()
+            else: self.binlog.poll()
+        except Exception as e:
+            self._log(f"Binary log write failed: {e}")
+
+    def _close_binlog(self):
+        if self.binlog:
+            try: self.binlog.close()
+            except Exception: pass
+            self.binlog = None
+
+    def _on_close(self):
+        if self.worker: self.worker.stop()
+        self._close_binlog()
+        self._close_store()
+        if self.server: self.server.stop()
+        self.destroy()
+
 if __name__ == "__main__":
     App().mainloop()
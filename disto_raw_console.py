@@ -1,44 +1,149 @@
 # disto_raw_console.py
 # Usage: python disto_raw_console.py COM7 9600
+#        python disto_raw_console.py COM7 9600 --dump [--interval 0.5] [--tee rx_D8.bin]
 # Try raw commands yourself (safe, zero-risk)
-# Quick console tool: it shows incoming bytes and lets you type something to send (it auto-adds \n unless you prefix hex:). 
+# Quick console tool: it shows incoming bytes and lets you type something to send (it auto-adds \r\n unless you prefix hex:).
 # Great for testing cfm, then poking “laser on/off” guesses without touching the GUI.
+# --dump: for streaming (H): RX is collected in the background and printed once per --interval as an
+# offset/hex/ASCII dump with live bytes/s and lines/s; anything beyond --max-show bytes per refresh is
+# skipped on screen (still counted, and written to --tee) so the console never falls behind the port.
 
-import sys, time, threading, serial, binascii
+import sys, time, threading, serial, binascii, argparse
 
-PORT = sys.argv[1] if len(sys.argv) > 1 else "COM7"
-BAUD = int(sys.argv[2]) if len(sys.argv) > 2 else 9600
+ASCII = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))   # non-printable → "."
+out_lock = threading.Lock()
+
+def say(text):
+    """Print from a background thread without mangling the input() prompt."""
+    with out_lock:
+        sys.stdout.write("\r" + text + "\n> "); sys.stdout.flush()
+
+def hexdump(data: bytes, offset: int) -> str:
+    rows = []
+    for i in range(0, len(data), 16):
+        row = data[i:i+16]
+        hx = row[:8].hex(" ") + ("  " + row[8:].hex(" ") if len(row) > 8 else "")
+        rows.append(f"{offset+i:08x}  {hx:<48} |{row.translate(ASCII).decode('ascii')}|")
+    return "\n".join(rows)
 
 def reader(ser):
-    buf = bytearray()
     while True:
         try:
             chunk = ser.read(1024)
         except Exception as e:
-            print("READ ERR:", e); break
+            if ser.is_open: say(f"READ ERR: {e}")
+            break
         if not chunk:
-            time.sleep(0.02); continue
-        print("RX HEX:", binascii.hexlify(chunk).decode())
+            continue
+        lines = ["RX HEX: " + binascii.hexlify(chunk).decode()]
         try:
             txt = chunk.decode(errors="ignore")
-            print("RX TXT:", txt.replace("\r","\\r").replace("\n","\\n"))
+            lines.append("RX TXT: " + txt.replace("\r","\\r").replace("\n","\\n"))
         except: pass
+        say("\n".join(lines))
+
+class DumpView:
+    """Background RX capture + batched hexdump rendering (--dump)."""
+    def __init__(self, ser, interval=0.5, max_show=4096, tee=None):
+        self.ser = ser
+        self.interval = interval
+        self.max_show = max_show
+        self.tee = open(tee, "ab") if tee else None
+        self.lock = threading.Lock()
+        self.pending = bytearray()
+        self.total = 0       # bytes since start
+        self.lines = 0       # line ends since start
+        self.offset = 0      # stream offset of the next byte to render
+        self.last_byte = b""  # tail of the previous read, so a split CRLF counts once
+        self.t0 = time.perf_counter()
+
+    def start(self):
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._render_loop, daemon=True).start()
+
+    def _read_loop(self):
+        while True:
+            try:
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                if self.ser.is_open: say(f"READ ERR: {e}")
+                break
+            if not chunk:
+                continue
+            # CR, LF and CRLF each end one line, also when CRLF is split across reads
+            n_lines = chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+            if self.last_byte == b"\r" and chunk[:1] == b"\n": n_lines -= 1
+            self.last_byte = chunk[-1:]
+            with self.lock:
+                if self.tee: self.tee.write(chunk)
+                self.pending += chunk
+                self.total += len(chunk); self.lines += n_lines
 
-with serial.Serial(PORT, BAUD, timeout=0.1) as ser:
-    print(f"Opened {PORT} @ {BAUD}. Type to send. Examples: cfm  |  hex:060a")
-    t = threading.Thread(target=reader, args=(ser,), daemon=True); t.start()
-    try:
+    def _render_loop(self):
+        last_t, last_total, last_lines = self.t0, 0, 0
         while True:
-            s = input("> ").strip()
-            if not s: continue
-            if s.startswith("hex:"):
-                #data = binascii.unhexlify(s[4:])
-                data = bytes.fromhex(s[4:])
-            else:
-                # send ASCII + LF
-                # data = (s + "\n").encode()
-                data = (s + "\r\n").encode()
-            ser.write(data); ser.flush()
-            print("TX:", data)
-    except KeyboardInterrupt:
-        pass
+            time.sleep(self.interval)
+            with self.lock:
+                data, self.pending = self.pending, bytearray()
+                total, lines = self.total, self.lines
+            now = time.perf_counter()
+            dt = now - last_t
+            bps = (total - last_total) / dt; lps = (lines - last_lines) / dt
+            last_t, last_total, last_lines = now, total, lines
+            with self.lock:
+                if self.tee: self.tee.flush()
+            if not data and not bps: continue
+
+            shown = data[-self.max_show:] if len(data) > self.max_show else data
+            skipped = len(data) - len(shown)
+            parts = []
+            if skipped:
+                parts.append(f"… {skipped} bytes not shown{' (in tee file)' if self.tee else ''}")
+            if shown:
+                parts.append(hexdump(bytes(shown), self.offset + skipped))
+            self.offset += len(data)
+            parts.append(f"-- {now - self.t0:7.1f}s  RX {total} B  {bps:7.0f} B/s  {lps:6.1f} lines/s"
+                         + (f"  skipped {skipped} B" if skipped else ""))
+            say("\n".join(parts))
+
+    def close(self):
+        with self.lock:
+            if self.tee: self.tee.close(); self.tee = None
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("port", nargs="?", default="COM7")
+    ap.add_argument("baud", nargs="?", type=int, default=9600)
+    ap.add_argument("--dump", action="store_true", help="batched hexdump view with throughput stats")
+    ap.add_argument("--interval", type=float, default=0.5, help="refresh interval for --dump (s)")
+    ap.add_argument("--max-show", type=int, default=4096, help="max bytes rendered per refresh")
+    ap.add_argument("--tee", default=None, help="append raw RX bytes to this file (implies --dump)")
+    args = ap.parse_args()
+
+    with serial.Serial(args.port, args.baud, timeout=0.1) as ser:
+        print(f"Opened {args.port} @ {args.baud}. Type to send. Examples: cfm  |  hex:060a")
+        view = None
+        if args.dump or args.tee:
+            view = DumpView(ser, args.interval, args.max_show, args.tee); view.start()
+        else:
+            t = threading.Thread(target=reader, args=(ser,), daemon=True); t.start()
+        try:
+            while True:
+                s = input("> ").strip()
+                if not s: continue
+                if s.startswith("hex:"):
+                    #data = binascii.unhexlify(s[4:])
+                    data = bytes.fromhex(s[4:])
+                else:
+                    # send ASCII + LF
+                    # data = (s + "\n").encode()
+                    data = (s + "\r\n").encode()
+                ser.write(data); ser.flush()
+                with out_lock: print("TX:", data)
+        except (KeyboardInterrupt, EOFError):
+            pass
+        finally:
+            if view: view.close()   # flush the tee before the port goes away
+
+if __name__ == "__main__":
+    main()
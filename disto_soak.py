@@ -0,0 +1,271 @@
+# disto_soak.py
+# Long-running soak test: drive SerialWorker (or the whole App drain path) against a
+# simulated DISTO at high rates and fail if memory or latency drifts over budget.
+# Usage:
+#   python disto_soak.py --duration 3600 --rate 200                   # worker only, pty device
+#   python disto_soak.py --duration 600 --rate 50 --gui               # App drain / log / plot path too
+#   python disto_soak.py --port COM20 --sim-port COM21 --rate 30      # Windows: com0com null-modem pair
+#   python disto_soak.py --max-rss-growth-mb 16 --max-p99-ms 250 --max-latency-drift-ms 50 --max-lost 0
+# The simulator sends 31.. tokens whose value is a sequence number, so every received word
+# can be matched to its send time (per-event latency = device write → consumer dequeue).
+# Every --interval seconds it prints RSS, tracemalloc size, queue depths and latency
+# percentiles; at the end the top allocators that grew since warm-up. Exit code 1 = budget blown
+# (an RSS or p99 that could not be measured, or any lost word, counts as blown).
+
+import sys, os, time, queue, threading, argparse, statistics, tracemalloc
+
+import disto_d8_guiR3 as gui
+
+SEQ_MOD = 10**8   # 8 digits in the token value
+
+def _rss_win32():
+    import ctypes
+    from ctypes import wintypes
+    class PMC(ctypes.Structure):   # PROCESS_MEMORY_COUNTERS
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                   [(n, ctypes.c_size_t) for n in ("PeakWorkingSetSize", "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+    k32, psapi = ctypes.WinDLL("kernel32"), ctypes.WinDLL("psapi")
+    k32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PMC), wintypes.DWORD]
+    pmc = PMC(); pmc.cb = ctypes.sizeof(PMC)
+    if not psapi.GetProcessMemoryInfo(k32.GetCurrentProcess(), ctypes.byref(pmc), pmc.cb):
+        raise ctypes.WinError()
+    return pmc.WorkingSetSize / 2**20
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except Exception:
+        pass
+    if sys.platform == "win32":
+        try: return _rss_win32()
+        except Exception: pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except Exception:
+        return float("nan")
+
+def pct(vals, p):
+    if not vals: return float("nan")
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(round(p / 100 * (len(vals) - 1))))]
+
+# -------- Simulated device --------
+class SimDevice(threading.Thread):
+    """Writes distance tokens at `rate` Hz and swallows whatever the host sends
+    (H/P commands, cfm). Backed by a pty pair, or by the far end of a
+    null-modem port pair when sim_port is given."""
+    def __init__(self, rate, sim_port=None, baud=115200):
+        super().__init__(daemon=True)
+        self.rate = rate
+        self.stop_flag = threading.Event()
+        self.sent = {}   # seq -> perf_counter at write
+        self.lock = threading.Lock()
+        self.count = 0
+        self.ser = None
+        if sim_port:
+            self.ser = gui._serial().Serial(sim_port, baud, timeout=0, write_timeout=1)
+            self.host_port = None
+        else:
+            import pty, tty
+            self.master, slave = pty.openpty()
+            tty.setraw(slave)
+            self._slave = slave   # keep the pty alive while the worker opens it
+            self.host_port = os.ttyname(slave)
+
+    def _write(self, data):
+        if self.ser: self.ser.write(data)
+        else: os.write(self.master, data)
+
+    def _drain_host(self):
+        if self.ser:
+            if self.ser.in_waiting: self.ser.read(self.ser.in_waiting)
+            return
+        import select
+        while select.select([self.master], [], [], 0)[0]:
+            os.read(self.master, 4096)
+
+    def run(self):
+        period = 1.0 / self.rate
+        nxt = time.perf_counter()
+        seq = 0
+        while not self.stop_flag.is_set():
+            now = time.perf_counter()
+            while nxt <= now:
+                seq = (seq + 1) % SEQ_MOD
+                with self.lock: self.sent[seq] = time.perf_counter()
+                self._write(b"31..00+%08d\r\n" % seq)
+                self.count += 1
+                nxt += period
+            self._drain_host()
+            time.sleep(min(period, 0.002))
+
+    def received(self, seq, t_now):
+        with self.lock: t = self.sent.pop(seq, None)
+        return None if t is None else t_now - t
+
+    def expire(self, older_than):
+        """Forget sends never seen by the consumer; returns how many were lost."""
+        cutoff = time.perf_counter() - older_than
+        with self.lock:
+            old = [k for k, t in self.sent.items() if t < cutoff]
+            for k in old: del self.sent[k]
+        return len(old)
+
+    def stop(self): self.stop_flag.set()
+
+# -------- Soak --------
+class TimedQueue(queue.Queue):
+    """App.out_q stand-in that reports every item App.drain dequeues."""
+    def __init__(self, on_item):
+        super().__init__(); self.on_item = on_item
+    def get_nowait(self):
+        item = super().get_nowait(); self.on_item(item); return item
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", type=float, default=600, help="seconds")
+    ap.add_argument("--rate", type=float, default=100, help="simulated words per second")
+    ap.add_argument("--interval", type=float, default=10, help="seconds between samples")
+    ap.add_argument("--warmup", type=float, default=30, help="seconds before baselines are taken")
+    ap.add_argument("--gui", action="store_true", help="run the App drain path (needs a display)")
+    ap.add_argument("--push", action="store_true", help="stay in push mode (cfm per word) instead of tracking")
+    ap.add_argument("--filter", action="store_true", help="enable the Kalman stage")
+    ap.add_argument("--port", default=None, help="host side of a null-modem pair (default: pty)")
+    ap.add_argument("--sim-port", default=None, help="simulator side of the pair")
+    ap.add_argument("--no-tracemalloc", action="store_true")
+    ap.add_argument("--max-rss-growth-mb", type=float, default=16)
+    ap.add_argument("--max-traced-growth-mb", type=float, default=8)
+    ap.add_argument("--max-p99-ms", type=float, default=250)
+    ap.add_argument("--max-latency-drift-ms", type=float, default=50)
+    ap.add_argument("--max-lost", type=int, default=0, help="words sent but never delivered")
+    args = ap.parse_args()
+
+    if not args.no_tracemalloc: tracemalloc.start(10)
+    sim = SimDevice(args.rate, args.sim_port)
+    port = args.port or sim.host_port
+    if not port: ap.error("--sim-port needs --port (host side of the pair)")
+
+    lat = [[]]   # latencies (s) of the current interval; swapped out at each sample
+    def on_item(item):
+        if item.get("type") == "word" and item["kind"] == "distance":
+            d = sim.received(item["raw"], time.perf_counter())
+            if d is not None: lat[0].append(d)
+
+    status = lambda state: None
+    app = None
+    if args.gui:
+        app = gui.App(); app.withdraw()
+        app.out_q = TimedQueue(on_item)
+        app.port_var.set(port); app.baud_var.set("115200")
+        app.filter_on.set(args.filter)
+        app.confirm_push.set(args.push)
+        app.toggle_connect()
+        worker = app.worker
+    else:
+        out_q = queue.Queue()
+        worker = gui.SerialWorker(port, 115200, out_q, status, confirm_push=args.push,
+                                  kf=gui.KalmanCV() if args.filter else None)
+        def consume():
+            while True:
+                try: on_item(out_q.get(timeout=0.2))
+                except queue.Empty: pass
+        threading.Thread(target=consume, daemon=True).start()
+        worker.start()
+
+    time.sleep(0.5)
+    if not args.push: worker.send_cmd("H")
+    sim.start()
+    print(f"Soak: {args.duration:.0f} s @ {args.rate:g} words/s on {port} "
+          f"({'App drain' if app else 'worker'}, {'push' if args.push else 'tracking'} mode)")
+
+    t_start = time.monotonic(); t_end = t_start + args.duration
+    next_sample = t_start + args.interval
+    base_rss = base_traced = base_snap = None
+    rows = []   # (elapsed, rss, traced, p50, p99, max)
+    lost_total = 0
+    while time.monotonic() < t_end and worker.is_alive():
+        if app:
+            app.update(); time.sleep(0.005)
+        else:
+            time.sleep(0.05)
+        now = time.monotonic()
+        if now < next_sample: continue
+        next_sample += args.interval
+        el = now - t_start
+        cur, lat[0] = lat[0], []
+        lost = sim.expire(older_than=10.0); lost_total += lost
+        rss = rss_mb()
+        traced = tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else float("nan")
+        p50, p99, mx = (pct(cur, 50) * 1000, pct(cur, 99) * 1000, max(cur, default=float("nan")) * 1000)
+        warm = el >= args.warmup
+        if warm and base_rss is None:
+            base_rss, base_traced = rss, traced
+            if tracemalloc.is_tracing(): base_snap = tracemalloc.take_snapshot()
+        if warm: rows.append((el, rss, traced, p50, p99, mx))
+        logq = f"  log={int(app.log.index('end-1c').split('.')[0]):6d}" if app else ""
+        outq = app.out_q if app else out_q
+        ps = worker.push_stats()
+        print(f"t={el:7.0f}s  rss={rss:7.1f} MB  traced={traced:6.1f} MB  out_q={outq.qsize():5d}  "
+              f"cmd_q={worker.cmd_q.qsize():3d}  buf={len(worker.buf):4d}{logq}  "
+              f"n={len(cur):6d}  lat p50={p50:6.1f} p99={p99:6.1f} max={mx:6.1f} ms  lost={lost}"
+              + (f"  cfm n={ps[0]} p95={ps[2]:.1f} ms" if ps else "")
+              + ("" if warm else "  (warm-up)"))
+
+    alive = worker.is_alive()
+    ps = worker.push_stats()
+    sim.stop(); worker.stop()
+    if app: app.after(200, app.destroy); app.mainloop()
+
+    # -------- verdict --------
+    fails = []
+    if not alive: fails.append("worker thread died")
+    if len(rows) < 2:
+        fails.append("too few samples after warm-up (raise --duration or lower --warmup/--interval)")
+    else:
+        # NaN compares False against every budget: a value that wasn't measured must not pass
+        nan = lambda v: v != v
+        rss_growth = rows[-1][1] - base_rss
+        traced_growth = rows[-1][2] - base_traced
+        p99s = [r[4] for r in rows]
+        empty = sum(map(nan, p99s))
+        print(f"\nRSS growth {rss_growth:+.1f} MB, traced growth {traced_growth:+.1f} MB, "
+              f"lost {lost_total}, sent {sim.count}, intervals without events {empty}/{len(rows)}")
+        if ps: print("push confirm (last %d): median %.1f  p95 %.1f  max %.1f ms" % ps)
+        if nan(rss_growth):
+            fails.append("RSS not measured (no /proc, GetProcessMemoryInfo or psutil)")
+        elif rss_growth > args.max_rss_growth_mb:
+            fails.append(f"RSS grew {rss_growth:.1f} MB > {args.max_rss_growth_mb} MB")
+        if nan(traced_growth):
+            print("traced heap: not measured (--no-tracemalloc)")
+        elif traced_growth > args.max_traced_growth_mb:
+            fails.append(f"traced heap grew {traced_growth:.1f} MB > {args.max_traced_growth_mb} MB")
+        if empty:
+            fails.append(f"no events delivered in {empty} of {len(rows)} intervals (p99 not measured)")
+        else:
+            k = max(1, min(3, len(rows) // 3))
+            p99_head = statistics.median(p99s[:k])
+            p99_tail = statistics.median(p99s[-k:])
+            p99_worst = max(p99s)
+            print(f"p99 {p99_head:.1f} → {p99_tail:.1f} ms (worst {p99_worst:.1f})")
+            if p99_worst > args.max_p99_ms:
+                fails.append(f"p99 latency {p99_worst:.1f} ms > {args.max_p99_ms} ms")
+            if p99_tail - p99_head > args.max_latency_drift_ms:
+                fails.append(f"p99 latency drifted {p99_tail - p99_head:+.1f} ms > {args.max_latency_drift_ms} ms")
+        if lost_total > args.max_lost:
+            fails.append(f"{lost_total} words lost > {args.max_lost}")
+    if base_snap is not None:
+        print("\nTop allocators since warm-up:")
+        for st in tracemalloc.take_snapshot().compare_to(base_snap, "lineno")[:10]:
+            print(f"  {st}")
+
+    for f in fails: print("FAIL:", f)
+    if not fails: print("PASS")
+    return 1 if fails else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
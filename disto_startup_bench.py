@@ -0,0 +1,73 @@
+# disto_startup_bench.py
+# Startup-time benchmark for the GUI (catch regressions in import time / time to first window).
+# Usage:
+#   python disto_startup_bench.py                      # 10 runs, import + first window
+#   python disto_startup_bench.py --runs 20 --no-window
+#   python disto_startup_bench.py --max-import-ms 150 --max-window-ms 600   # exit 1 if median is over budget
+# Each run is a fresh interpreter, so nothing is cached between runs except the OS file cache.
+# "import" = import disto_d8_guiR3; "window" = process launch → App() created and first frame drawn.
+# Port enumeration runs in the background and is intentionally not part of "window".
+
+import sys, os, time, json, argparse, subprocess, statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import disto_d8_guiR3 as g
+t1 = time.perf_counter()
+res = {"import_ms": (t1 - t0) * 1000}
+if sys.argv[2] == "1":
+    app = g.App()
+    app.update()   # map the window and draw the first frame
+    res["wall_done"] = time.time()
+    app.destroy()
+print(json.dumps(res))
+"""
+
+def run_once(window):
+    t_launch = time.time()
+    out = subprocess.run([sys.executable, "-c", CHILD, HERE, "1" if window else "0"],
+                         capture_output=True, text=True, timeout=60)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "child failed")
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    if window: res["window_ms"] = (res.pop("wall_done") - t_launch) * 1000
+    return res
+
+def summary(name, vals):
+    vals = sorted(vals)
+    p95 = vals[min(len(vals) - 1, int(round(0.95 * (len(vals) - 1))))]
+    med = statistics.median(vals)
+    print(f"{name:8} min {vals[0]:8.1f}  median {med:8.1f}  p95 {p95:8.1f}  max {vals[-1]:8.1f}  ms")
+    return med
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--no-window", action="store_true", help="only measure import time (headless)")
+    ap.add_argument("--max-import-ms", type=float, default=None)
+    ap.add_argument("--max-window-ms", type=float, default=None)
+    args = ap.parse_args()
+
+    window = not args.no_window
+    results = []
+    run_once(window)   # warm the OS file cache; not counted
+    for i in range(args.runs):
+        results.append(run_once(window))
+
+    print(f"Python {sys.version.split()[0]}, {args.runs} runs")
+    med_imp = summary("import", [r["import_ms"] for r in results])
+    med_win = summary("window", [r["window_ms"] for r in results]) if window else None
+
+    failed = False
+    if args.max_import_ms is not None and med_imp > args.max_import_ms:
+        print(f"FAIL: import median {med_imp:.1f} ms > budget {args.max_import_ms:.1f} ms"); failed = True
+    if args.max_window_ms is not None and med_win is not None and med_win > args.max_window_ms:
+        print(f"FAIL: window median {med_win:.1f} ms > budget {args.max_window_ms:.1f} ms"); failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
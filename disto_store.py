@@ -0,0 +1,174 @@
+# disto_store.py
+# SQLite time-series store for the worker's decoded words.
+# Usage:
+#   GUI: "DB…" picks a .sqlite file; every word event from then on is stored.
+#   python disto_store.py summary track_D8.sqlite
+#   python disto_store.py query track_D8.sqlite --kind distance --from 2025-01-31T08:00 --to 2025-01-31T09:00
+#   python disto_store.py query track_D8.sqlite --kind distance --bucket 60      # 1-minute min/avg/max
+# WAL mode: the GUI keeps writing while another process queries the same file.
+
+import sys, os, time, queue, threading, sqlite3, argparse
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    id          INTEGER PRIMARY KEY,
+    device      TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    t           REAL    NOT NULL,
+    token       TEXT    NOT NULL,
+    word_index  INTEGER,
+    raw         INTEGER,
+    value       REAL
+);
+CREATE INDEX IF NOT EXISTS words_device_kind_t ON words(device, kind, t);
+CREATE INDEX IF NOT EXISTS words_kind_t ON words(kind, t);
+"""
+
+def _connect(path):
+    con = sqlite3.connect(path, timeout=5.0)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+class WordStore:
+    """Batched writer thread + query API over 'word' events.
+
+    put() is the worker-side sink: it never blocks; when the queue is full the
+    item is counted in `dropped` instead of stalling acquisition. The writer
+    commits one transaction per `batch` rows or every `flush_secs` seconds.
+    A failed commit (locked DB, disk full) keeps the rows and retries every
+    second; the error is kept in `last_error` until a commit succeeds again.
+    With readonly=True no writer thread is started (query-only use) and the
+    file must already exist.
+    """
+    def __init__(self, path, device="", batch=200, flush_secs=1.0, maxsize=20000, readonly=False):
+        self.path = path
+        self.device = device
+        self.batch = batch
+        self.flush_secs = flush_secs
+        self.q = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.written = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        if readonly:
+            if not os.path.isfile(path): raise FileNotFoundError(f"No such database: {path}")
+            return
+        con = _connect(path); con.executescript(SCHEMA); con.close()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- writing ---
+    def put(self, item):
+        if item.get("type") != "word": return
+        row = (item.get("device", self.device), item["kind"], item["t"], item["token"],
+               item["word_index"], item["raw"], item["value"])
+        try: self.q.put_nowait(row)
+        except queue.Full: self.dropped += 1
+
+    __call__ = put   # usable directly as a SerialWorker sink
+
+    def _run(self):
+        con = None
+        rows = []; first = 0.0; retry_at = 0.0
+        try:
+            while not (self._stop.is_set() and self.q.empty() and (not rows or self.last_error)):
+                try:
+                    rows.append(self.q.get(timeout=0.2))
+                    if len(rows) == 1: first = time.monotonic()
+                except queue.Empty:
+                    pass
+                if len(rows) > self.q.maxsize:   # failing for a while: keep the newest
+                    self.dropped += len(rows) - self.q.maxsize
+                    del rows[:len(rows) - self.q.maxsize]
+                now = time.monotonic()
+                if not rows or now < retry_at: continue
+                if not (len(rows) >= self.batch or self._stop.is_set() or now - first >= self.flush_secs):
+                    continue
+                try:
+                    if con is None: con = _connect(self.path)
+                    with con:
+                        con.executemany("INSERT INTO words(device,kind,t,token,word_index,raw,value) "
+                                        "VALUES (?,?,?,?,?,?,?)", rows)
+                except sqlite3.Error as e:
+                    self.last_error = str(e); retry_at = now + 1.0
+                    continue
+                self.written += len(rows); rows = []
+                self.last_error = None
+        finally:
+            if rows: self.dropped += len(rows)
+            if con is not None: con.close()
+
+    def close(self):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout=5)
+
+    # --- queries (own connection; safe from any thread / process) ---
+    def _where(self, kind, t_from, t_to, device):
+        sql, args = [], []
+        if device is not None: sql.append("device = ?"); args.append(device)
+        if kind is not None:   sql.append("kind = ?");   args.append(kind)
+        if t_from is not None: sql.append("t >= ?");     args.append(t_from)
+        if t_to is not None:   sql.append("t <= ?");     args.append(t_to)
+        return (" WHERE " + " AND ".join(sql)) if sql else "", args
+
+    def query(self, kind=None, t_from=None, t_to=None, device=None, limit=None):
+        """Rows as dicts ordered by time; t_from/t_to are seconds since epoch."""
+        where, args = self._where(kind, t_from, t_to, device)
+        sql = "SELECT device,kind,t,token,word_index,raw,value FROM words" + where + " ORDER BY t"
+        if limit: sql += f" LIMIT {int(limit)}"
+        con = _connect(self.path); con.row_factory = sqlite3.Row
+        try: return [dict(r) for r in con.execute(sql, args)]
+        finally: con.close()
+
+    def aggregate(self, kind, bucket_s, t_from=None, t_to=None, device=None):
+        """Downsampled (t_bucket, n, min, avg, max) per bucket_s seconds."""
+        where, args = self._where(kind, t_from, t_to, device)
+        sql = ("SELECT CAST(t / ? AS INTEGER) * ? AS tb, COUNT(*), MIN(value), AVG(value), MAX(value) "
+               "FROM words" + where + " GROUP BY tb ORDER BY tb")
+        con = _connect(self.path)
+        try: return con.execute(sql, [bucket_s, bucket_s, *args]).fetchall()
+        finally: con.close()
+
+    def summary(self):
+        con = _connect(self.path)
+        try:
+            return con.execute("SELECT device, kind, COUNT(*), MIN(t), MAX(t) FROM words "
+                               "GROUP BY device, kind ORDER BY device, kind").fetchall()
+        finally: con.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("summary"); p.add_argument("db")
+    p = sub.add_parser("query");   p.add_argument("db")
+    p.add_argument("--kind", default="distance")
+    p.add_argument("--device", default=None)
+    p.add_argument("--from", dest="t_from", default=None, help="ISO start time")
+    p.add_argument("--to", dest="t_to", default=None, help="ISO end time")
+    p.add_argument("--bucket", type=float, default=None, help="aggregate per N seconds")
+    p.add_argument("--limit", type=int, default=None)
+    args = ap.parse_args()
+
+    try:
+        st = WordStore(args.db, readonly=True)
+    except FileNotFoundError as e:
+        print(e); return 1
+    fmt = lambda t: datetime.fromtimestamp(t).isoformat(timespec="seconds")
+    if args.cmd == "summary":
+        for dev, kind, n, t0, t1 in st.summary():
+            print(f"{dev or '-':10} {kind:12} {n:9d}  {fmt(t0)} → {fmt(t1)}")
+        return
+    iso = lambda s: datetime.fromisoformat(s).timestamp() if s else None
+    t_from, t_to = iso(args.t_from), iso(args.t_to)
+    if args.bucket:
+        for tb, n, lo, avg, hi in st.aggregate(args.kind, args.bucket, t_from, t_to, args.device):
+            print(f"{fmt(tb)}  n={n:<6d} min={lo:.4f}  avg={avg:.4f}  max={hi:.4f}")
+    else:
+        for r in st.query(args.kind, t_from, t_to, args.device, args.limit):
+            print(f"{fmt(r['t'])}  {r['device']}  {r['kind']}  {r['value']}  [{r['token']}]")
+
+if __name__ == "__main__":
+    sys.exit(main())
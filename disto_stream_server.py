@@ -0,0 +1,190 @@
+# disto_stream_server.py
+# Local fan-out of live DISTO events to other processes (dashboards, PLC bridges).
+# Usage:
+#   GUI: tick "Serve" → listens on 127.0.0.1:8765 while the GUI runs.
+#   python disto_stream_server.py COM7 --port 8765      # headless: worker + server, no GUI
+# Protocol (TCP, one JSON object per line, UTF-8):
+#   client → server : "subscribe\n" → from now on every worker event is sent
+#                     ({"type":"word","kind":"distance","value":1.234,...}, "status", "tracking",
+#                     "avg_done"); {"type":"dropped","count":N} if the client fell behind and
+#                     its oldest lines were discarded.
+#                     "latest\n" → {"type":"latest", "distance":{...}, "temperature":{...}, ...}
+#                     "quit\n"   → close
+#   One-shot read:  send "latest\n", read one line, close (no need to open the COM port).
+#   A subscribed client that also asks for "latest" gets it in stream order: skip lines until
+#   type == "latest".
+#   Quick look:     (echo subscribe; cat) | nc 127.0.0.1 8765
+
+import sys, json, queue, socket, threading, argparse
+from collections import deque
+
+DEFAULT_PORT = 8765
+
+class _Client:
+    def __init__(self, sock, addr, maxlen):
+        self.sock = sock
+        self.addr = addr
+        self.q = deque(maxlen=maxlen)
+        self.cv = threading.Condition()
+        self.dropped = 0
+        self.alive = True
+        self.subscribed = False   # events are only queued after "subscribe"
+
+    def offer(self, line: bytes):
+        with self.cv:
+            if len(self.q) == self.q.maxlen: self.dropped += 1   # deque drops the oldest
+            self.q.append(line); self.cv.notify()
+
+    def close(self):
+        with self.cv:
+            self.alive = False; self.cv.notify()
+        try: self.sock.close()
+        except Exception: pass
+
+class StreamServer:
+    """Broadcasts worker events to many localhost clients.
+
+    publish() is a SerialWorker sink: it serialises each event once, updates the
+    "latest values" cache and appends to every client's bounded queue. It never
+    waits on a socket; slow clients lose their oldest lines instead of stalling
+    acquisition. Each client has its own sender and reader thread.
+    """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, client_queue=1000, forward_debug=False):
+        self.host = host
+        self.port = port
+        self.client_queue = client_queue
+        self.forward_debug = forward_debug
+        self.clients = []
+        self.lock = threading.Lock()
+        self.latest = {"type": "latest", "tracking": False}
+        self._stop = threading.Event()
+        self._sock = None
+
+    # --- lifecycle ---
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if sys.platform == "win32":
+            # SO_REUSEADDR on Windows would let a second GUI bind the same port silently
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self._sock.settimeout(0.5)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        try: self._sock.close()
+        except Exception: pass
+        with self.lock: clients, self.clients = self.clients, []
+        for c in clients: c.close()
+
+    # --- worker side ---
+    def publish(self, item):
+        t = item.get("type")
+        if t == "debug" and not self.forward_debug: return
+        upd = None
+        if t == "word":
+            upd = {item["kind"]: {k: item[k] for k in ("ts","t","value","display","token","filt_m","vel_mps") if k in item}}
+        elif t == "tracking":
+            upd = {"tracking": item["active"]}
+        elif t == "avg_done":
+            upd = {"avg": {"avg_m": item["avg_m"], "count": item["count"]}}
+        with self.lock:
+            # copy-and-swap: readers serialise a dict that is never mutated afterwards
+            if upd: self.latest = {**self.latest, **upd}
+            clients = [c for c in self.clients if c.subscribed]
+        if not clients: return
+        line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+        for c in clients: c.offer(line)
+
+    __call__ = publish
+
+    def latest_line(self) -> bytes:
+        with self.lock: snap = self.latest
+        return (json.dumps(snap, ensure_ascii=False) + "\n").encode("utf-8")
+
+    # --- client handling ---
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try: sock, addr = self._sock.accept()
+            except socket.timeout: continue
+            except OSError: break
+            sock.settimeout(30.0)   # a client that stops reading for 30 s is dropped
+            c = _Client(sock, addr, self.client_queue)
+            with self.lock: self.clients.append(c)
+            threading.Thread(target=self._send_loop, args=(c,), daemon=True).start()
+            threading.Thread(target=self._recv_loop, args=(c,), daemon=True).start()
+
+    def _remove(self, c):
+        c.close()
+        with self.lock:
+            if c in self.clients: self.clients.remove(c)
+
+    def _send_loop(self, c):
+        try:
+            while True:
+                with c.cv:
+                    while c.alive and not c.q: c.cv.wait(0.5)
+                    if not c.alive: break
+                    lines = list(c.q); c.q.clear()
+                    dropped, c.dropped = c.dropped, 0
+                if dropped:
+                    lines.insert(0, (json.dumps({"type":"dropped","count":dropped}) + "\n").encode())
+                c.sock.sendall(b"".join(lines))
+        except Exception:
+            pass
+        finally:
+            self._remove(c)
+
+    def _recv_loop(self, c):
+        buf = b""
+        try:
+            while c.alive:
+                try: chunk = c.sock.recv(1024)
+                except socket.timeout: continue
+                if not chunk: break
+                buf += chunk
+                while b"\n" in buf:
+                    line, _, buf = buf.partition(b"\n")
+                    cmd = line.strip().decode(errors="ignore").lower()
+                    if cmd == "latest": c.offer(self.latest_line())
+                    elif cmd == "subscribe": c.subscribed = True
+                    elif cmd == "quit": return
+                buf = buf[-1024:]
+        except Exception:
+            pass
+        finally:
+            self._remove(c)
+
+def main():
+    from disto_d8_guiR3 import SerialWorker
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("com", nargs="?", default="COM7")
+    ap.add_argument("--baud", type=int, default=9600)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--client-queue", type=int, default=1000, help="lines buffered per client before drop-oldest")
+    args = ap.parse_args()
+
+    srv = StreamServer(args.host, args.port, args.client_queue).start()
+    q = queue.Queue()
+    worker = SerialWorker(args.com, args.baud, q, lambda state: None, sinks=[srv])
+    worker.start()
+    print(f"Serving {args.com} @ {args.baud} on {args.host}:{srv.port}. Ctrl+C to stop.")
+    try:
+        while worker.is_alive():
+            try: item = q.get(timeout=1.0)
+            except queue.Empty: continue
+            if item.get("type") == "debug": print(item["text"])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop(); worker.join(timeout=2); srv.stop()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# disto_trigger.py
+# Unattended event capture during tracking (H).
+# Usage:
+#   python disto_trigger.py COM7 --cross 2.500 --step 5
+#   python disto_trigger.py COM7 --step 2 --pre 100 --post 100 --heartbeat 600 --csv events_D8.csv
+#   python disto_trigger.py COM7 --step 5 --min-signal 300 --temp-change 0.5 --poll 60
+# Watches the decoded word stream and keeps only a fixed pre-trigger ring in memory.
+# When a condition fires, the ring + the next --post words go to the CSV; between events
+# only a heartbeat row every --heartbeat seconds is written (also when the device is silent).
+# Ctrl+C stops tracking (P).
+# H only streams 31.. words, so --min-signal / --temp-change need --poll N: every N seconds
+# tracking is paused (P), T and/or K are read, and H resumes — expect a ~2-3 s gap in distances.
+
+import time, queue, argparse, csv, os
+from collections import deque
+from datetime import datetime
+
+from disto_d8_guiR3 import SerialWorker
+
+class TriggerEngine:
+    """Trigger conditions on 'word' events with pre/post-trigger capture.
+
+    Conditions (None = off): distance crosses cross_m, distance step > step_mm,
+    signal drops below min_signal_mv, temperature moved >= temp_change_c since
+    the last temperature event. Every emitted row goes to sink(row).
+    """
+    def __init__(self, sink, pre=50, post=50, cross_m=None, step_mm=None,
+                 min_signal_mv=None, temp_change_c=None, heartbeat=None):
+        self.sink = sink
+        self.post = post
+        self.cross_m = cross_m
+        self.step_mm = step_mm
+        self.min_signal_mv = min_signal_mv
+        self.temp_change_c = temp_change_c
+        self.heartbeat = heartbeat
+
+        self.ring = deque(maxlen=pre)
+        self.post_left = 0
+        self.events = 0
+        self.last_beat = None
+        self.last_word = None   # newest word since the last heartbeat
+        self.prev_dist = None
+        self.sig_low = False
+        self.temp_ref = None
+
+    def _check(self, item):
+        kind = item["kind"]; v = item["value"]
+        if kind == "distance":
+            prev, self.prev_dist = self.prev_dist, v
+            if prev is None: return None
+            th = self.cross_m
+            if th is not None and (prev < th) != (v < th):
+                return f"cross {th:.3f} m"
+            if self.step_mm is not None and abs(v - prev) * 1000 > self.step_mm:
+                return f"step {(v - prev) * 1000:+.0f} mm"
+        elif kind == "signal" and self.min_signal_mv is not None:
+            low = v < self.min_signal_mv
+            fired = low and not self.sig_low   # edge only, not every weak sample
+            self.sig_low = low
+            if fired: return f"signal < {self.min_signal_mv} mV"
+        elif kind == "temperature" and self.temp_change_c is not None:
+            ref, changed = self.temp_ref, False
+            if ref is None or abs(v - ref) >= self.temp_change_c:
+                self.temp_ref = v; changed = ref is not None
+            if changed: return f"temp {v - ref:+.1f} °C"
+        return None
+
+    def _out(self, item, role, reason="", ts=None):
+        self.sink({
+            "timestamp": ts or item["ts"],
+            "event": self.events,
+            "role": role,
+            "reason": reason,
+            "token": item["token"],
+            "kind": item["kind"],
+            "value": item["value"],
+        })
+
+    def feed(self, item):
+        if item.get("type") != "word": return None
+        reason = self._check(item)
+        if reason:
+            if not self.post_left:
+                self.events += 1
+                for old in self.ring: self._out(old, "pre")
+                self.ring.clear()
+            self._out(item, "trigger", reason)
+            self.post_left = self.post   # re-trigger extends the window
+        elif self.post_left:
+            self._out(item, "post"); self.post_left -= 1
+        else:
+            self.ring.append(item)
+        self.last_word = item
+        return reason
+
+    def beat(self, now):
+        """Timer-driven heartbeat (call regularly, words or not). Writes the latest
+        word if one arrived since the last beat, else a 'silent' row."""
+        if not self.heartbeat: return
+        if self.last_beat is None: self.last_beat = now
+        if now - self.last_beat < self.heartbeat: return
+        ts = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+        w = self.last_word
+        if w is not None:
+            self._out(w, "heartbeat", ts=ts)
+            # persisted now; don't write it again as 'pre' if an event follows
+            if self.ring and self.ring[-1] is w: self.ring.pop()
+        else:
+            self.sink({"timestamp": ts, "event": self.events, "role": "heartbeat",
+                       "reason": f"silent {now - self.last_beat:.0f} s", "token": "", "kind": "", "value": ""})
+        self.last_word = None
+        self.last_beat = now
+
+class CsvSink:
+    HDR = ["timestamp","event","role","reason","token","kind","value"]
+
+    def __init__(self, path):
+        need_header = not (os.path.exists(path) and os.path.getsize(path) > 0)
+        self.f = open(path, "a", newline="", encoding="utf-8")
+        self.w = csv.DictWriter(self.f, fieldnames=self.HDR)
+        if need_header: self.w.writeheader()
+
+    def __call__(self, row):
+        self.w.writerow(row); self.f.flush()
+
+    def close(self): self.f.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("port", nargs="?", default="COM7")
+    ap.add_argument("--baud", type=int, default=9600)
+    ap.add_argument("--csv", default=None, help="CSV output path (default: events_<timestamp>.csv)")
+    ap.add_argument("--pre", type=int, default=50, help="words kept before a trigger")
+    ap.add_argument("--post", type=int, default=50, help="words written after a trigger")
+    ap.add_argument("--heartbeat", type=float, default=600, help="seconds between heartbeat rows (0=off)")
+    ap.add_argument("--cross", type=float, default=None, help="distance threshold (m)")
+    ap.add_argument("--step", type=float, default=None, help="step change between readings (mm)")
+    ap.add_argument("--min-signal", type=int, default=None, help="signal floor (mV, needs --poll: reads K)")
+    ap.add_argument("--temp-change", type=float, default=None, help="temperature change (°C, needs --poll: reads T)")
+    ap.add_argument("--poll", type=float, default=0, help="seconds between T/K reads (pauses tracking ~2-3 s)")
+    args = ap.parse_args()
+    if (args.min_signal is not None or args.temp_change is not None) and not args.poll:
+        ap.error("--min-signal / --temp-change need --poll N: tracking (H) streams only 31.. words, "
+                 "signal (K) and temperature (T) have to be read in between")
+
+    csv_path = args.csv or time.strftime("events_%Y%m%d_%H%M%S.csv")
+    sink = CsvSink(csv_path)
+    eng = TriggerEngine(sink, pre=args.pre, post=args.post, cross_m=args.cross, step_mm=args.step,
+                        min_signal_mv=args.min_signal, temp_change_c=args.temp_change,
+                        heartbeat=args.heartbeat or None)
+
+    q = queue.Queue()
+    worker = SerialWorker(args.port, args.baud, q, lambda state: None, confirm_push=False)
+    worker.start()
+    time.sleep(1.0)
+    worker.send_cmd("H")
+    print(f"Tracking on {args.port} @ {args.baud}. Writing events to {csv_path}. Ctrl+C to stop.")
+
+    # poll sequence: (command, seconds to wait before the next step)
+    steps = [("P", 0.3)]
+    if args.temp_change is not None: steps.append(("T", 0.8))
+    if args.min_signal is not None:  steps += [("K", 0.8), ("P", 0.3)]
+    steps.append(("H", 0))
+    next_poll = time.monotonic() + args.poll if args.poll else None
+    step_i = None; step_at = 0.0
+
+    words = 0
+    try:
+        while worker.is_alive():
+            now = time.monotonic()
+            if next_poll is not None and step_i is None and now >= next_poll:
+                step_i, step_at = 0, now
+            if step_i is not None and now >= step_at:
+                cmd, wait = steps[step_i]
+                worker.send_cmd(cmd)
+                step_i += 1; step_at = now + wait
+                if step_i == len(steps):
+                    step_i = None; next_poll = now + args.poll
+            eng.beat(time.time())
+            try: item = q.get(timeout=0.2)
+            except queue.Empty: continue
+            t = item.get("type")
+            if t == "word":
+                words += 1
+                reason = eng.feed(item)
+                if reason: print(f"{item['ts']}  EVENT #{eng.events}: {reason}  [{item['token']}]")
+            elif t == "debug":
+                print(item["text"])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop_tracking(); time.sleep(0.3)
+        worker.stop(); worker.join(timeout=2)
+        sink.close()
+        print(f"{words} words seen, {eng.events} events written to {csv_path}")
+
+if __name__ == "__main__":
+    main()